@@ -1,23 +1,54 @@
 import os
+
+# A single 48x48 image gains nothing from more threads, whatever the backend
+INFERENCE_THREADS = 2
+
+# Must be set before TensorFlow is imported: CPU-only, quiet, and small thread pools
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+os.environ.setdefault("OMP_NUM_THREADS", str(INFERENCE_THREADS))
+# Same cap for the numba kernel's parallel loop, read when pixel_kernels is imported
+os.environ.setdefault("NUMBA_NUM_THREADS", str(INFERENCE_THREADS))
+
 import sys
 import io
-import json
+import csv
+import atexit
+import sqlite3
 import logging
+import hashlib
+import collections
+import threading
+import concurrent.futures
 import numpy as np
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import tensorflow as tf
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
 from datetime import datetime
+from image_preprocessing import resize_pixels
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 # Configure logging
 logging.basicConfig(filename="cancer_app.log", level=logging.INFO, 
                    format="%(asctime)s - %(levelname)s - %(message)s")
 
+PREDICTION_CACHE_SIZE = 128
+HISTORY_DB = "history.db"
+MAX_BATCH = 32
+DISPLAY_SIZE = (350, 350)
+PIXEL_SCALE = np.float32(1 / 255.0)
+
+def normalize_pixels(src, dst, scale):
+    # NumPy fallback, replaced by the numba kernel in pixel_kernels once it has loaded
+    np.multiply(src, scale, out=dst, dtype=np.float32)
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller bundle """
     try:
@@ -27,6 +58,17 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+def import_tensorflow():
+    """ Import TensorFlow with thread pools sized for single-image CPU inference """
+    import tensorflow as tf
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(INFERENCE_THREADS)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    except RuntimeError:
+        # Runtime already initialized by a previously loaded model
+        pass
+    return tf
+
 class CancerDetectionApp:
     def __init__(self, root):
         self.root = root
@@ -34,9 +76,13 @@ class CancerDetectionApp:
         self.root.geometry("900x700")
         self.root.configure(bg="#f0f0f5")
         self.root.resizable(False, False)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self._closing = False
         
-        # Load configuration
-        self.config = self.load_config()
+        # Load configuration; changes stay in memory and are written once at exit
+        self.config = self._load_config()
+        self._config_dirty = False
+        atexit.register(self._save_config)
         
         # Set app icon
         try:
@@ -46,55 +92,234 @@ class CancerDetectionApp:
         
         # Initialize variables
         self.image_path = None
+        # Uploaded images waiting for prediction: (file_path, content_hash, rgb_image)
+        self._pending = []
         self.model = None
+        self.interpreter = None
+        self._session = None
+        self._infer = None
         self.model_loaded = False
         self.prediction_made = False
         self.confidence_scores = None
+        self.warmup_done = threading.Event()
+        # Single worker so predictions never run concurrently on the shared input buffer
+        self._exec = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        # Image content hash -> (class_index, confidence_scores), least recently used first
+        self._pred_cache = collections.OrderedDict()
+        
+        # Prediction history persists across sessions
+        self._db = sqlite3.connect(HISTORY_DB)
+        self._db.execute("CREATE TABLE IF NOT EXISTS hist(ts TEXT, fn TEXT, result TEXT, conf REAL)")
+        atexit.register(self._db.close)
+        
+        # Preallocated input buffers, reused by every prediction
+        height, width = self.config["target_size"]
+        self._input_buf = np.empty((MAX_BATCH, height, width, 3), dtype=np.float32)
+        self._resize_buf = np.empty((height, width, 3), dtype=np.uint8)
+        self._normalize = normalize_pixels
+        # Smallest decode size both the preview and the model input can still be resized from
+        self._draft_size = (max(DISPLAY_SIZE[0], 2 * width), max(DISPLAY_SIZE[1], 2 * height))
+        
+        # Create the UI first so the window paints while the model loads
+        self.create_ui()
         
         # Load the model
         self.load_model_file()
         
-        # Create the UI
-        self.create_ui()
-        
-    def load_config(self):
+    def call_on_ui_thread(self, callback, *args):
+        # Worker threads may finish after the window is gone; there's nothing left to update then
+        if self._closing:
+            return
+        try:
+            self.root.after(0, callback, *args)
+        except (tk.TclError, RuntimeError):
+            pass
+    
+    def on_close(self):
+        self._closing = True
+        self._exec.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+    
+    def _load_config(self):
         default_config = {
             "model_path": "cancer_detection_model.h5",
             "target_size": [48, 48],
             "threshold": 0.5
         }
         try:
-            with open("config.json", "r") as f:
-                return json.load(f)
+            with open("config.json", "rb") as f:
+                return _json.loads(f.read())
         except FileNotFoundError:
-            with open("config.json", "w") as f:
-                json.dump(default_config, f)
             return default_config
     
-    def load_model_file(self):
+    def _save_config(self):
+        # Only write when the app changed something, so edits made while it runs survive
+        if not self._config_dirty:
+            return
+        data = _json.dumps(self.config)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        try:
+            with open("config.json", "wb") as f:
+                f.write(data)
+        except OSError as e:
+            logging.error(f"Failed to save config: {str(e)}")
+    
+    def load_model_file(self, file_path=None):
+        # Importing TensorFlow and loading the model takes seconds, keep it off the UI thread
+        self.status_var.set("Loading model... you can upload an image meanwhile")
+        threading.Thread(target=self._bg_load_model, args=(file_path,), daemon=True).start()
+    
+    def _bg_load_model(self, file_path):
         try:
-            # Use resource_path() to get the bundled model's location
-            model_path = resource_path(self.config["model_path"])
-            self.model = load_model(model_path)
-            self.model_loaded = True
-            logging.info("Model loaded successfully from default path")
-        except FileNotFoundError:
-            logging.warning("Default model not found, prompting user selection")
-            file_path = filedialog.askopenfilename(
-                title="Select Model File",
-                filetypes=[("HDF5 files", "*.h5")]
-            )
             if file_path:
-                self.model = load_model(file_path)
-                self.model_loaded = True
-                self.config["model_path"] = file_path
-                with open("config.json", "w") as f:
-                    json.dump(self.config, f)
+                self.load_model_path(file_path)
                 logging.info(f"Model loaded from user-selected path: {file_path}")
+            else:
+                # Use resource_path() to get the bundled model's location
+                self.load_model_path(resource_path(self.config["model_path"]))
+                logging.info("Model loaded successfully from default path")
+        except FileNotFoundError:
+            logging.warning("Default model not found, prompting user selection")
+            self.call_on_ui_thread(self.prompt_model_file)
+            return
         except Exception as e:
-            self.model_loaded = False
             logging.error(f"Failed to load model: {str(e)}")
-            messagebox.showerror("Model Error", f"Failed to load model: {str(e)}")
+            self.call_on_ui_thread(self._on_model_error, str(e))
+            return
+        
+        self.warmup_model()
+        self.call_on_ui_thread(self._on_model_ready, file_path)
+    
+    def prompt_model_file(self):
+        file_path = filedialog.askopenfilename(
+            title="Select Model File",
+            filetypes=[("Model files", "*.h5 *.tflite *.onnx"), ("HDF5 files", "*.h5"),
+                       ("TFLite files", "*.tflite"), ("ONNX files", "*.onnx")]
+        )
+        if file_path:
+            self.load_model_file(file_path)
+        else:
+            self.status_var.set("Model not loaded")
+            messagebox.showwarning("Model Not Found", 
+                                 "Please ensure a valid model file is available.")
+    
+    def _on_model_ready(self, file_path):
+        self.model_loaded = True
+        if file_path:
+            if self.config["model_path"] != file_path:
+                self.config["model_path"] = file_path
+                self._config_dirty = True
+        if self.image_path:
+            self.status_var.set(f"Model ready - image loaded: {os.path.basename(self.image_path)}")
+            self.predict_button.config(state="normal")
+        else:
+            self.status_var.set("Please upload an image to begin")
+    
+    def _on_model_error(self, error):
+        self.model_loaded = False
+        self.status_var.set("Model not loaded")
+        messagebox.showerror("Model Error", f"Failed to load model: {error}")
+    
+    def load_model_path(self, model_path):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(model_path)
+        if model_path.endswith(".tflite"):
+            self.load_tflite_model(model_path)
+        elif model_path.endswith(".onnx"):
+            self.load_onnx_model(model_path)
+        else:
+            self.load_keras_model(model_path)
+    
+    def load_keras_model(self, model_path):
+        tf = import_tensorflow()
+        from tensorflow.keras.models import load_model
+        self.model = load_model(model_path)
+        self._tf = tf
+        # Trace once for the fixed input shape instead of going through model.predict() per call
+        height, width = self.config["target_size"]
+        self._keras_fn = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec((None, height, width, 3), tf.float32)]
+        ).get_concrete_function()
+        self._infer = self.invoke_keras
+    
+    def invoke_keras(self, batch):
+        return self._keras_fn(self._tf.constant(batch)).numpy()
+    
+    def load_tflite_model(self, model_path):
+        tf = import_tensorflow()
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=INFERENCE_THREADS)
+        self.interpreter.allocate_tensors()
+        input_details = self.interpreter.get_input_details()[0]
+        output_details = self.interpreter.get_output_details()[0]
+        self._input_index = input_details["index"]
+        self._input_batch = input_details["shape"][0]
+        self._input_dtype = input_details["dtype"]
+        self._input_quant = input_details["quantization"]
+        self._output_index = output_details["index"]
+        self._output_dtype = output_details["dtype"]
+        self._output_quant = output_details["quantization"]
+        self._infer = self.invoke_tflite
+        logging.info(f"TFLite model loaded with input dtype {np.dtype(self._input_dtype).name}")
+    
+    def invoke_tflite(self, batch):
+        if self._input_dtype != np.float32:
+            # Quantize the [0, 1] input with the tensor's own params (scale 1/255 for uint8 models)
+            scale, zero_point = self._input_quant
+            # Clip before the cast: pixels brighter than anything seen in calibration would wrap
+            info = np.iinfo(self._input_dtype)
+            batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max)
+            batch = batch.astype(self._input_dtype)
+        if batch.shape[0] != self._input_batch:
+            self.interpreter.resize_tensor_input(self._input_index, batch.shape)
+            self.interpreter.allocate_tensors()
+            self._input_batch = batch.shape[0]
+        self.interpreter.set_tensor(self._input_index, batch)
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self._output_index)
+        if self._output_dtype != np.float32:
+            scale, zero_point = self._output_quant
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+    
+    def load_onnx_model(self, model_path):
+        # onnxruntime only, TensorFlow is never imported for ONNX models
+        import onnxruntime as ort
+        so = ort.SessionOptions()
+        so.intra_op_num_threads = INFERENCE_THREADS
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(model_path, sess_options=so,
+                                             providers=["CPUExecutionProvider"])
+        self._in_name = self._session.get_inputs()[0].name
+        self._infer = self.invoke_onnx
+        logging.info(f"ONNX model loaded with input '{self._in_name}'")
+    
+    def invoke_onnx(self, batch):
+        return self._session.run(None, {self._in_name: batch})[0]
+    
+    def warmup_model(self):
+        # One dummy forward pass so the first real prediction doesn't pay for graph tracing
+        height, width = self.config["target_size"]
+        dummy = np.zeros((1, height, width, 3), dtype=np.float32)
+        try:
+            self._infer(dummy)
+            logging.info("Model warmup completed")
+        except Exception as e:
+            logging.warning(f"Model warmup failed: {str(e)}")
+        
+        try:
+            # Importing numba and compiling (or loading the cached) kernel happens here,
+            # off the UI thread and before the first prediction
+            from pixel_kernels import normalize_pixels as numba_normalize
+            numba_normalize(np.zeros((height, width, 3), dtype=np.uint8), dummy[0], PIXEL_SCALE)
+            self._normalize = numba_normalize
+        except ImportError:
+            pass
+        except Exception as e:
+            logging.warning(f"numba kernel unavailable, using NumPy: {str(e)}")
+        finally:
+            self.warmup_done.set()
     
     def create_ui(self):
         # Header
@@ -125,9 +350,9 @@ class CancerDetectionApp:
         button_frame = tk.Frame(left_panel, bg="#f0f0f5")
         button_frame.pack(fill=tk.X, pady=10)
         
-        upload_button = ttk.Button(button_frame, text="Upload Image", 
-                                 command=self.upload_image, style="Accent.TButton")
-        upload_button.pack(side=tk.LEFT, padx=(0, 10))
+        self.upload_button = ttk.Button(button_frame, text="Upload Image", 
+                                      command=self.upload_image, style="Accent.TButton")
+        self.upload_button.pack(side=tk.LEFT, padx=(0, 10))
         
         self.predict_button = ttk.Button(button_frame, text="Detect Cancer", 
                                        command=self.predict_cancer, state="disabled",
@@ -170,10 +395,6 @@ class CancerDetectionApp:
         # Style
         self.style = ttk.Style()
         self.style.configure("Accent.TButton", font=("Helvetica", 11))
-        
-        if not self.model_loaded:
-            messagebox.showwarning("Model Not Found", 
-                                 "Please ensure a valid model file is available.")
     
     def create_results_tab(self):
         results_frame = tk.Frame(self.results_tab, padx=15, pady=15)
@@ -218,10 +439,11 @@ class CancerDetectionApp:
         self.canvas1 = FigureCanvasTkAgg(self.fig1, master=metrics_frame)
         self.canvas1.get_tk_widget().pack(fill=tk.X, pady=10)
         
+        # Bars and labels are created once and only resized on each prediction
+        self._bars = self.ax1.barh(["Non-Cancerous", "Cancerous"], [0, 0], color=["green", "red"])
+        self._bar_texts = [self.ax1.text(0, i, "", va='center') for i in range(2)]
         self.ax1.set_title("Confidence Scores")
-        self.ax1.set_xlim(0, 1)
-        self.ax1.set_yticks([0, 1])
-        self.ax1.set_yticklabels(["Non-Cancerous", "Cancerous"])
+        self.ax1.set_xlim(0, 1.1)
         self.ax1.set_xlabel("Confidence Score")
         self.fig1.tight_layout()
         
@@ -237,10 +459,10 @@ class CancerDetectionApp:
         self.metrics_tree.column("Value", width=150)
         self.metrics_tree.pack(fill=tk.BOTH, expand=True)
         
-        self.metrics_tree.insert("", "end", values=("Class", "--"))
-        self.metrics_tree.insert("", "end", values=("Confidence Score", "--"))
-        self.metrics_tree.insert("", "end", values=("Non-Cancerous Probability", "--"))
-        self.metrics_tree.insert("", "end", values=("Cancerous Probability", "--"))
+        # Keep the row IDs so update_metrics can update them without listing the tree
+        self._metric_rows = [self.metrics_tree.insert("", "end", values=(metric, "--"))
+                             for metric in ("Class", "Confidence Score",
+                                            "Non-Cancerous Probability", "Cancerous Probability")]
         self.metrics_tree.insert("", "end", values=("Decision Threshold", f"{self.config['threshold']}"))
     
     def create_history_tab(self):
@@ -281,34 +503,81 @@ class CancerDetectionApp:
         self.export_history_button = ttk.Button(button_frame, text="Export History", 
                                               command=self.export_history)
         self.export_history_button.pack(side=tk.RIGHT, padx=10)
+        
+        for ts, fn, result, conf in self._db.execute("SELECT * FROM hist ORDER BY rowid DESC"):
+            self.history_tree.insert("", "end", values=(ts, fn, result, f"{conf:.2%}"))
     
     def upload_image(self):
-        file_path = filedialog.askopenfilename(
-            title="Select Image",
+        file_paths = filedialog.askopenfilenames(
+            title="Select Image(s)",
             filetypes=[("Image files", "*.jpg *.jpeg *.png")]
         )
         
-        if file_path:
+        if file_paths:
             try:
-                img = Image.open(file_path)
                 min_size = min(self.config["target_size"])
-                if img.size[0] < min_size or img.size[1] < min_size:
-                    messagebox.showwarning("Warning", f"Image must be at least {min_size}x{min_size} pixels.")
+                pending, too_small, unreadable = [], [], []
+                for file_path in file_paths:
+                    try:
+                        if not pending:
+                            # The previewed image is read and decoded once here; display, hashing
+                            # and prediction all reuse the result
+                            with open(file_path, 'rb') as f:
+                                data = f.read()
+                            size = Image.open(io.BytesIO(data)).size
+                        else:
+                            # The rest only get a header check; the worker reads and decodes them
+                            # chunk by chunk so memory stays bounded however many are selected
+                            with Image.open(file_path) as img:
+                                size = img.size
+                        if size[0] < min_size or size[1] < min_size:
+                            too_small.append(os.path.basename(file_path))
+                        elif not pending:
+                            key = hashlib.blake2b(data, digest_size=16).digest()
+                            pending.append((file_path, key, self.decode_image(data)))
+                        else:
+                            pending.append((file_path, None, None))
+                    except Exception as e:
+                        unreadable.append(os.path.basename(file_path))
+                        logging.error(f"Image upload failed for {file_path}: {str(e)}")
+                if too_small:
+                    messagebox.showwarning("Warning", f"Image must be at least {min_size}x{min_size} pixels. "
+                                                      f"Skipped: {', '.join(too_small)}")
+                if unreadable:
+                    messagebox.showerror("Error", f"Invalid image file(s) skipped: {', '.join(unreadable)}")
+                if not pending:
                     return
-                self.image_path = file_path
-                self.load_and_display_image(file_path)
-                self.status_var.set(f"Image loaded: {os.path.basename(file_path)}")
-                self.predict_button.config(state="normal")
-                self.image_info_label.config(text=f"Image: {os.path.basename(file_path)}")
-                logging.info(f"Image uploaded: {file_path}")
+                self._pending = pending
+                self.image_path = pending[0][0]
+                self.load_and_display_image(pending[0][2])
+                filename = os.path.basename(self.image_path)
+                if len(pending) == 1:
+                    self.status_var.set(f"Image loaded: {filename}")
+                    self.image_info_label.config(text=f"Image: {filename}")
+                else:
+                    self.status_var.set(f"{len(pending)} images loaded")
+                    self.image_info_label.config(text=f"Image: {filename} (+{len(pending) - 1} more)")
+                if self.model_loaded:
+                    self.predict_button.config(state="normal")
+                logging.info(f"Images uploaded: {[entry[0] for entry in pending]}")
             except Exception as e:
                 messagebox.showerror("Error", f"Invalid image file: {str(e)}")
                 logging.error(f"Image upload failed: {str(e)}")
     
-    def load_and_display_image(self, file_path):
+    def decode_image(self, data):
+        img = Image.open(io.BytesIO(data))
+        # Let libjpeg decode large JPEGs at a reduced scale (no-op for other formats)
+        img.draft('RGB', self._draft_size)
+        # Convert once here so prediction never has to; most JPEGs are RGB already
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        else:
+            img.load()
+        return img
+    
+    def load_and_display_image(self, img):
         self.placeholder_label.place_forget()
-        img = Image.open(file_path)
-        img = self.resize_image_aspect_ratio(img, (350, 350))
+        img = self.resize_image_aspect_ratio(img, DISPLAY_SIZE)
         photo = ImageTk.PhotoImage(img)
         
         if hasattr(self, 'image_label'):
@@ -323,20 +592,63 @@ class CancerDetectionApp:
         width, height = img.size
         ratio = min(max_size[0] / width, max_size[1] / height)
         new_size = (int(width * ratio), int(height * ratio))
-        return img.resize(new_size, Image.LANCZOS)
+        # Display only: bilinear is visually the same as LANCZOS at this size and much faster
+        return img.resize(new_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
     
-    def preprocess_image(self, image):
+    def preprocess_image(self, image, index=0):
         if not self.model_loaded:
             raise ValueError("Model not loaded")
         
-        input_shape = tuple(self.config["target_size"])
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        image = image.resize(input_shape)
-        image = img_to_array(image)
-        image = np.expand_dims(image, axis=0)
-        image = image / 255.0
-        return image
+        height, width = self.config["target_size"]
+        assert image.mode == 'RGB', "images are converted to RGB on upload"
+        # Resize into the uint8 staging buffer; HWC is what the model expects
+        pixels = resize_pixels(image, (width, height), dst=self._resize_buf)
+        # Then scale into the float buffer in one pass
+        self._normalize(pixels, self._input_buf[index], PIXEL_SCALE)
+        return self._input_buf[index:index + 1]
+    
+    def predict_batch(self, entries):
+        # Runs on the worker. Images not decoded at upload are read, hashed and decoded one at
+        # a time as their chunk comes up, and dropped once they're in the input buffer.
+        # Repeats are served from the cache, everything else goes through the model per chunk.
+        results, failed = [], []
+        inferred = 0
+        for start in range(0, len(entries), MAX_BATCH):
+            chunk_results = {}
+            slots = {}  # content hash -> input buffer index, for images that need the model
+            chunk_keys = []
+            for file_path, key, img in entries[start:start + MAX_BATCH]:
+                try:
+                    if key is None:
+                        with open(file_path, 'rb') as f:
+                            data = f.read()
+                        key = hashlib.blake2b(data, digest_size=16).digest()
+                    if key in self._pred_cache:
+                        self._pred_cache.move_to_end(key)
+                        chunk_results[key] = self._pred_cache[key]
+                    elif key not in slots:
+                        if img is None:
+                            img = self.decode_image(data)
+                        self.preprocess_image(img, len(slots))
+                        slots[key] = len(slots)
+                    chunk_keys.append((file_path, key))
+                except Exception as e:
+                    failed.append(os.path.basename(file_path))
+                    logging.error(f"Prediction skipped {file_path}: {str(e)}")
+            
+            if slots:
+                predictions = self._infer(self._input_buf[:len(slots)])
+                for key, i in slots.items():
+                    chunk_results[key] = (int(np.argmax(predictions[i])), predictions[i])
+                    self._pred_cache[key] = chunk_results[key]
+                    if len(self._pred_cache) > PREDICTION_CACHE_SIZE:
+                        self._pred_cache.popitem(last=False)
+                inferred += len(slots)
+            results.extend((file_path,) + chunk_results[key] for file_path, key in chunk_keys)
+        
+        logging.info(f"Batch prediction: {len(results) - inferred} cached, {inferred} inferred, "
+                     f"{len(failed)} failed")
+        return results, failed
     
     def predict_cancer(self):
         if not self.model_loaded:
@@ -351,90 +663,113 @@ class CancerDetectionApp:
         progress.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
         progress.start()
         self.status_var.set("Processing...")
-        self.root.update()
-        
+        # No new upload until this batch is shown, or results could land next to the wrong image
+        self.predict_button.config(state="disabled")
+        self.upload_button.config(state="disabled")
+        
+        # Inference runs on the worker; Tk widgets are only touched back on the main thread
+        logging.info(f"Predicting for {len(self._pending)} image(s): {self.image_path}")
+        future = self._exec.submit(self._run_prediction, list(self._pending))
+        future.add_done_callback(
+            lambda f: self.call_on_ui_thread(self._finish_predict, f, progress))
+    
+    def _run_prediction(self, entries):
+        # Don't race the background warmup on the first click
+        self.warmup_done.wait()
+        return self.predict_batch(entries)
+    
+    def _finish_predict(self, future, progress):
+        payload = {"progress": progress}
+        try:
+            payload["results"] = future.result()
+        except Exception as e:
+            payload["error"] = e
+        self.root.after_idle(self._apply_ui_update, payload)
+    
+    def _apply_ui_update(self, payload):
+        # Every widget change for a prediction in one idle callback, so Tk redraws once
         try:
-            logging.info(f"Predicting for image: {self.image_path}")
-            img_pil = Image.open(self.image_path)
-            processed_img = self.preprocess_image(img_pil)
-            predictions = self.model.predict(processed_img)
-            class_index = np.argmax(predictions, axis=1)[0]
-            self.confidence_scores = predictions[0]
+            if "error" in payload:
+                raise payload["error"]
+            
+            results, failed = payload["results"]
+            if failed:
+                messagebox.showerror("Error", f"Prediction skipped invalid image(s): {', '.join(failed)}")
+            if not results:
+                raise ValueError("no image could be processed")
             
-            self.update_results(class_index, self.confidence_scores)
-            self.update_metrics(class_index, self.confidence_scores)
-            self.add_to_history(class_index, self.confidence_scores)
+            # Results and metrics follow the displayed image, history gets every image
+            file_path, class_index, scores = results[0]
+            if file_path == self.image_path:
+                self.confidence_scores = scores
+                self.update_results(class_index, scores)
+                self.update_metrics(class_index, scores)
+                self.tab_control.select(0)
+            for file_path, result_index, scores in results:
+                self.add_to_history(file_path, result_index, scores)
+            self._db.commit()
             
             self.prediction_made = True
             self.status_var.set("Prediction complete")
-            self.tab_control.select(0)
-            logging.info(f"Prediction completed: Class {class_index}, Confidence {self.confidence_scores}")
+            logging.info(f"Prediction completed for {len(results)} image(s), first: Class {class_index}")
         
         except Exception as e:
             messagebox.showerror("Error", f"Prediction failed: {str(e)}")
             logging.error(f"Prediction failed: {str(e)}")
         
         finally:
+            progress = payload["progress"]
             progress.stop()
             progress.place_forget()
+            self.predict_button.config(state="normal")
+            self.upload_button.config(state="normal")
     
     def update_results(self, class_index, confidence_scores):
         threshold = self.config["threshold"]
         confidence = confidence_scores[class_index]
         if class_index == 1 and confidence >= threshold:
-            result_text = "🔴 CANCER DETECTED"
-            self.result_label.config(text=result_text, fg="red")
+            result_text, result_color = "🔴 CANCER DETECTED", "red"
         else:
-            result_text = "🟢 NO CANCER DETECTED"
-            self.result_label.config(text=result_text, fg="green")
+            result_text, result_color = "🟢 NO CANCER DETECTED", "green"
         
-        self.confidence_label.config(text=f"Confidence: {confidence:.2%}")
-        self.confidence_bar["value"] = confidence * 100
+        self.result_label.configure(text=result_text, fg=result_color)
+        self.confidence_label.configure(text=f"Confidence: {confidence:.2%}")
+        self.confidence_bar.configure(value=confidence * 100)
     
     def update_metrics(self, class_index, confidence_scores):
-        self.ax1.clear()
-        classes = ["Non-Cancerous", "Cancerous"]
-        colors = ["green", "red"]
-        bars = self.ax1.barh(classes, confidence_scores, color=colors)
-        
-        for bar, score in zip(bars, confidence_scores):
-            self.ax1.text(bar.get_width() + 0.01, bar.get_y() + bar.get_height()/2,
-                         f"{score:.2%}", va='center')
-        
-        self.ax1.set_title("Confidence Scores")
-        self.ax1.set_xlim(0, 1.1)
-        self.ax1.set_xlabel("Confidence Score")
-        self.fig1.tight_layout()
-        self.canvas1.draw()
-        
-        for i, item in enumerate(self.metrics_tree.get_children()):
-            if i == 0:
-                value = "Cancerous" if class_index == 1 else "Non-Cancerous"
-                self.metrics_tree.item(item, values=("Class", value))
-            elif i == 1:
-                value = f"{confidence_scores[class_index]:.4f}"
-                self.metrics_tree.item(item, values=("Confidence Score", value))
-            elif i == 2:
-                value = f"{confidence_scores[0]:.4f}"
-                self.metrics_tree.item(item, values=("Non-Cancerous Probability", value))
-            elif i == 3:
-                value = f"{confidence_scores[1]:.4f}"
-                self.metrics_tree.item(item, values=("Cancerous Probability", value))
-    
-    def add_to_history(self, class_index, confidence_scores):
+        for i, score in enumerate(confidence_scores):
+            self._bars[i].set_width(score)
+            self._bar_texts[i].set_position((score + 0.01, i))
+            self._bar_texts[i].set_text(f"{score:.2%}")
+        self.canvas1.draw_idle()
+        
+        class_row, confidence_row, non_cancerous_row, cancerous_row = self._metric_rows
+        value = "Cancerous" if class_index == 1 else "Non-Cancerous"
+        self.metrics_tree.item(class_row, values=("Class", value))
+        self.metrics_tree.item(confidence_row,
+                               values=("Confidence Score", f"{confidence_scores[class_index]:.4f}"))
+        self.metrics_tree.item(non_cancerous_row,
+                               values=("Non-Cancerous Probability", f"{confidence_scores[0]:.4f}"))
+        self.metrics_tree.item(cancerous_row,
+                               values=("Cancerous Probability", f"{confidence_scores[1]:.4f}"))
+    
+    def add_to_history(self, file_path, class_index, confidence_scores):
         current_date = datetime.now().strftime("%Y-%m-%d %H:%M")
-        filename = os.path.basename(self.image_path)
+        filename = os.path.basename(file_path)
         result = "Cancer" if class_index == 1 else "No Cancer"
-        confidence = f"{confidence_scores[class_index]:.2%}"
-        self.history_tree.insert("", 0, values=(current_date, filename, result, confidence))
+        confidence = float(confidence_scores[class_index])
+        # Committed by the caller once per prediction batch
+        self._db.execute("INSERT INTO hist VALUES(?,?,?,?)", (current_date, filename, result, confidence))
+        self.history_tree.insert("", 0, values=(current_date, filename, result, f"{confidence:.2%}"))
     
     def clear_history(self):
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
+        self._db.execute("DELETE FROM hist")
+        self._db.commit()
+        self.history_tree.delete(*self.history_tree.get_children())
         logging.info("History cleared")
     
     def export_history(self):
-        if not self.history_tree.get_children():
+        if not self._db.execute("SELECT EXISTS(SELECT 1 FROM hist)").fetchone()[0]:
             messagebox.showinfo("Info", "No history to export.")
             return
         
@@ -446,11 +781,11 @@ class CancerDetectionApp:
         
         if file_path:
             try:
-                with open(file_path, 'w') as f:
-                    f.write("Date,Filename,Result,Confidence\n")
-                    for item in self.history_tree.get_children():
-                        values = self.history_tree.item(item, "values")
-                        f.write(f"{values[0]},{values[1]},{values[2]},{values[3]}\n")
+                rows = self._db.execute("SELECT * FROM hist ORDER BY rowid DESC")
+                with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(("Date", "Filename", "Result", "Confidence"))
+                    writer.writerows((ts, fn, result, f"{conf:.2%}") for ts, fn, result, conf in rows)
                 messagebox.showinfo("Success", f"History exported to {file_path}")
                 logging.info(f"History exported to {file_path}")
             except Exception as e:
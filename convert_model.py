@@ -0,0 +1,105 @@
+import os
+import random
+import argparse
+import logging
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+from image_preprocessing import resize_pixels
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+def list_images(image_dir):
+    image_paths = []
+    for dir_path, _, file_names in os.walk(image_dir):
+        for file_name in file_names:
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                image_paths.append(os.path.join(dir_path, file_name))
+    return image_paths
+
+def load_calibration_images(image_dir, target_size, num_samples=100):
+    """ Sample images and resize/scale them with the app's resize_pixels, for int8 calibration """
+    image_paths = list_images(image_dir)
+    if not image_paths:
+        raise ValueError(f"No calibration images found in {image_dir}")
+    random.seed(7)
+    random.shuffle(image_paths)
+
+    height, width = target_size
+    for path in image_paths[:num_samples]:
+        pixels = resize_pixels(Image.open(path).convert("RGB"), (width, height))
+        image = pixels.astype(np.float32)[np.newaxis] / 255.0
+        yield image
+
+def convert_to_tflite(model_path, output_path, calibration_dir, target_size, num_samples=100):
+    model = tf.keras.models.load_model(model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = lambda: (
+        [image] for image in load_calibration_images(calibration_dir, target_size, num_samples))
+    # Full integer quantization: uint8 pixels in, float32 probabilities out
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+
+    tflite_model = converter.convert()
+    with open(output_path, "wb") as f:
+        f.write(tflite_model)
+    logging.info(f"TFLite model written to {output_path} ({len(tflite_model) / 1024:.1f} KiB)")
+
+def convert_to_onnx(model_path, output_path, calibration_dir, target_size, num_samples=100):
+    import tf2onnx
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                          quantize_static)
+
+    class ImageDataReader(CalibrationDataReader):
+        def __init__(self, input_name):
+            self.input_name = input_name
+            self.images = load_calibration_images(calibration_dir, target_size, num_samples)
+
+        def get_next(self):
+            image = next(self.images, None)
+            return None if image is None else {self.input_name: image}
+
+    model = tf.keras.models.load_model(model_path)
+    height, width = target_size
+    spec = (tf.TensorSpec((None, height, width, 3), tf.float32, name="input"),)
+    float_path = os.path.splitext(output_path)[0] + ".float.onnx"
+    tf2onnx.convert.from_keras(model, input_signature=spec, output_path=float_path)
+
+    # QDQ int8 quantization so onnxruntime can use its VNNI/int8 kernels
+    quantize_static(float_path, output_path, ImageDataReader("input"),
+                    quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QInt8,
+                    weight_type=QuantType.QInt8)
+    logging.info(f"ONNX model written to {output_path} "
+                 f"({os.path.getsize(output_path) / 1024:.1f} KiB)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the Keras model for faster CPU inference")
+    parser.add_argument("--model", default="cancer_detection_model.h5",
+                        help="path to the trained Keras .h5 model")
+    parser.add_argument("--format", choices=("tflite", "onnx"), default="tflite",
+                        help="target runtime of the converted model")
+    parser.add_argument("--output", help="path of the converted model "
+                        "(default: cancer_detection_model.tflite or .int8.onnx)")
+    parser.add_argument("--calibration-dir", required=True,
+                        help="folder of sample images used to calibrate int8 quantization")
+    parser.add_argument("--num-samples", type=int, default=100,
+                        help="number of calibration images")
+    parser.add_argument("--target-size", type=int, nargs=2, default=[48, 48],
+                        help="model input height and width")
+    args = parser.parse_args()
+
+    if args.format == "onnx":
+        output = args.output or "cancer_detection_model.int8.onnx"
+        convert_to_onnx(args.model, output, args.calibration_dir,
+                        args.target_size, args.num_samples)
+    else:
+        output = args.output or "cancer_detection_model.tflite"
+        convert_to_tflite(args.model, output, args.calibration_dir,
+                          args.target_size, args.num_samples)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# Box filtering is what cv2.INTER_AREA does when downscaling, so both paths agree
+RESIZE_FILTER = Image.Resampling.BOX
+
+def resize_pixels(image, size, dst=None):
+    """ Resize an RGB PIL image to size=(width, height), returning uint8 HWC pixels.
+
+    Shared by the app and the int8 calibration in convert_model.py so the model sees
+    the same inputs at calibration and inference time, with or without OpenCV.
+    """
+    if cv2 is not None:
+        # Writes straight into dst when it has the right shape and dtype
+        return cv2.resize(np.asarray(image), size, dst=dst, interpolation=cv2.INTER_AREA)
+    pixels = np.asarray(image.resize(size, RESIZE_FILTER))
+    if dst is None:
+        return pixels
+    np.copyto(dst, pixels)
+    return dst
@@ -0,0 +1,10 @@
+# Imported lazily from the model-loading thread: numba/llvmlite take a while to import
+from numba import njit, prange
+
+@njit(cache=True, parallel=True, fastmath=True)
+def normalize_pixels(src, dst, scale):
+    # uint8 HWC -> scaled float32 HWC in a single pass over memory
+    for i in prange(src.shape[0]):
+        for j in range(src.shape[1]):
+            for c in range(src.shape[2]):
+                dst[i, j, c] = src[i, j, c] * scale